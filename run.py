@@ -3,6 +3,13 @@ from src.analyzers.code_analyzer import CodeAnalyzer
 from pathlib import Path
 import asyncio
 
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    # uvloop sólo existe en Linux/macOS; el loop estándar sirve igual
+    pass
+
 async def main():
     config = AnalyzerConfig(project_root=Path("."), openai_api_key="tu_clave_api")
     analyzer = CodeAnalyzer(config)
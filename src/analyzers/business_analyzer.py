@@ -2,32 +2,43 @@
 from pathlib import Path
 from typing import Dict, List, Set
 import asyncio
+import itertools
+import logging
+import re
+import orjson
 from ..models.entities import BusinessEntity, BusinessProcess
 from ..utils.chunking import CodeChunker
+from ..utils.file_io import read_source
 from ..utils.llm_handler import LLMHandler
 
+logger = logging.getLogger(__name__)
+
 class BusinessAnalyzer:
+    # Analysis layers: layer name -> (path pattern, LLM context)
+    LAYERS = {
+        'models': (r'models/.*\.py$', 'Domain model analysis'),
+        'services': (r'services/.*\.py$', 'Business service analysis'),
+        'controllers': (r'controllers/.*\.py$', 'Controller/API analysis'),
+        'views': (r'views/.*\.(py|js|jsx|ts|tsx)$', 'View/UI analysis')
+    }
+
     def __init__(self, config: 'AnalyzerConfig'):
         self.config = config
         self.chunker = CodeChunker(config.llm_config.max_tokens)
         self.llm_handler = LLMHandler(config.llm_config, config.cache_dir)
+        self._layer_patterns = {layer: re.compile(pattern)
+                               for layer, (pattern, _) in self.LAYERS.items()}
+        self._file_sem = asyncio.Semaphore(config.max_concurrent_files)
+        self._llm_sem = asyncio.Semaphore(config.max_concurrent_llm)
         self.entities: Dict[str, BusinessEntity] = {}
         self.processes: Dict[str, BusinessProcess] = {}
     
     async def analyze_business_logic(self) -> tuple[Dict, Dict]:
         """Analyze project's business logic using layered approach."""
-        # Define analysis layers
-        layers = {
-            'models': (r'models/.*\.py$', 'Domain model analysis'),
-            'services': (r'services/.*\.py$', 'Business service analysis'),
-            'controllers': (r'controllers/.*\.py$', 'Controller/API analysis'),
-            'views': (r'views/.*\.(py|js|jsx|ts|tsx)$', 'View/UI analysis')
-        }
-        
         # Analyze each layer concurrently
         analyses = await asyncio.gather(
-            *[self._analyze_layer(layer, pattern, context) 
-              for layer, (pattern, context) in layers.items()]
+            *[self._analyze_layer(layer, self._layer_patterns[layer], context)
+              for layer, (_, context) in self.LAYERS.items()]
         )
         
         # Merge layer analyses
@@ -39,9 +50,9 @@ class BusinessAnalyzer:
         
         return self.entities, self.processes
     
-    async def _analyze_layer(self, layer: str, pattern: str, context: str) -> Dict:
+    async def _analyze_layer(self, layer: str, pattern: 're.Pattern', context: str) -> Dict:
         """Analyze a specific architectural layer."""
-        files = [f for f in self.config.project_root.rglob('*')
+        files = [f for f in self.config.scan_files
                 if self._matches_pattern(f, pattern)]
         
         analyses = await asyncio.gather(
@@ -50,65 +61,76 @@ class BusinessAnalyzer:
         
         return self._merge_file_analyses(analyses)
     
-    def _matches_pattern(self, file_path: Path, pattern: str) -> bool:
-        """Check if file matches pattern and is in supported languages."""
-        if not file_path.is_file():
-            return False
-            
-        if any(p in str(file_path) for p in self.config.ignore_patterns):
-            return False
-            
-        return bool(re.search(pattern, str(file_path)))
+    def _matches_pattern(self, file_path: Path, pattern: 're.Pattern') -> bool:
+        """Check if an already-scanned file belongs to the layer."""
+        # scan_files has filtered out directories and ignored paths already.
+        return bool(pattern.search(str(file_path)))
     
     async def _analyze_file(self, file_path: Path, layer: str, context: str) -> Dict:
         """Analyze a single file for business logic."""
         try:
-            with open(file_path) as f:
-                content = f.read()
-            
-            chunks = list(self.chunker.chunk_code(content))
+            async with self._file_sem:
+                content = await read_source(file_path, self.config.max_file_bytes)
+            if content is None:
+                return {}
+
             file_context = f"{context} - File: {file_path.name}"
-            
-            analyses = await asyncio.gather(
-                *[self.llm_handler.analyze_chunk(chunk, file_context) 
-                  for chunk in chunks]
-            )
+            batch_size = self.config.llm_config.batch_size
+
+            # Consume the chunker lazily: each chunk is only referenced by
+            # the task analyzing its batch instead of one materialized list
+            # holding every chunk alongside the full file content.
+            tasks = []
+            batch: List[str] = []
+            for chunk in self.chunker.chunk_code(content):
+                batch.append(chunk)
+                if len(batch) == batch_size:
+                    tasks.append(asyncio.create_task(
+                        self._bounded_batch_analysis(batch, file_context)))
+                    batch = []
+            if batch:
+                tasks.append(asyncio.create_task(
+                    self._bounded_batch_analysis(batch, file_context)))
+
+            analyses = [analysis for task in tasks
+                        for analysis in await task]
             
             return self._merge_chunk_analyses(analyses, file_path)
-            
-        except Exception as e:
-            print(f"Error analyzing {file_path}: {e}")
+
+        except (OSError, UnicodeDecodeError, SyntaxError) as e:
+            # I/O and decode problems are per-file noise; programmer errors
+            # should propagate instead of being swallowed.
+            logger.warning("Error analyzing %s: %s", file_path, e)
             return {}
-    
+
+    async def _bounded_batch_analysis(self, chunks: List[str], context: str) -> List[Dict]:
+        """Run a batched chunk analysis under the shared LLM concurrency cap."""
+        async with self._llm_sem:
+            return await self.llm_handler.analyze_chunks_batch(chunks, context)
+
     def _merge_chunk_analyses(self, analyses: List[Dict], file_path: Path) -> Dict:
         """Merge analyses from different chunks of the same file."""
-        merged = {
-            'entities': [],
-            'processes': [],
-            'relationships': [],
-            'rules': []
-        }
-        
-        seen_entities = set()
-        seen_processes = set()
-        
+        entities: Dict[str, Dict] = {}
+        processes: Dict[str, Dict] = {}
+
         for analysis in analyses:
-            # Merge entities
-            for entity in analysis.get('entities', []):
-                if entity['name'] not in seen_entities:
-                    seen_entities.add(entity['name'])
-                    merged['entities'].append(entity)
-            
-            # Merge processes
-            for process in analysis.get('processes', []):
-                if process['name'] not in seen_processes:
-                    seen_processes.add(process['name'])
-                    merged['processes'].append(process)
-                    merged['relationships'].extend(analysis.get('relationships', []))
-            merged['rules'].extend(analysis.get('rules', []))
-        
-        merged['source_file'] = file_path
-        return merged
+            # First occurrence of each name wins; dict gives O(1) dedup
+            for entity in analysis.get('entities', ()):
+                entities.setdefault(entity['name'], entity)
+            for process in analysis.get('processes', ()):
+                processes.setdefault(process['name'], process)
+
+        # Relationships used to be collected only when a chunk introduced a
+        # new process; flatten them unconditionally instead.
+        return {
+            'entities': list(entities.values()),
+            'processes': list(processes.values()),
+            'relationships': list(itertools.chain.from_iterable(
+                a.get('relationships', ()) for a in analyses)),
+            'rules': list(itertools.chain.from_iterable(
+                a.get('rules', ()) for a in analyses)),
+            'source_file': file_path
+        }
     
     def _merge_file_analyses(self, analyses: List[Dict]) -> Dict:
         """Merge analyses from different files in the same layer."""
@@ -124,7 +146,7 @@ class BusinessAnalyzer:
             for entity in analysis.get('entities', []):
                 name = entity['name']
                 if name not in merged['entities']:
-                    merged['entities'][name] = entity
+                    merged['entities'][name] = self._normalize_entity(entity)
                     merged['entities'][name]['source_files'] = {analysis['source_file']}
                 else:
                     self._merge_entity(merged['entities'][name], entity)
@@ -144,12 +166,36 @@ class BusinessAnalyzer:
         
         return merged
     
+    @staticmethod
+    def _normalize_entity(entity: Dict) -> Dict:
+        """Key attributes/methods by name so later merges are dict unions."""
+        for key in ('attributes', 'methods'):
+            value = entity.get(key, {})
+            if not isinstance(value, dict):
+                entity[key] = {item['name']: item for item in value}
+            else:
+                entity[key] = value
+        entity.setdefault('relationships', [])
+        entity.setdefault('rules', [])
+        return entity
+
     def _merge_entity(self, existing: Dict, new: Dict):
         """Merge two versions of the same business entity."""
-        existing['attributes'].update(new.get('attributes', []))
-        existing['methods'].update(new.get('methods', []))
-        existing['relationships'].extend(new.get('relationships', []))
-        existing['rules'].extend(new.get('rules', []))
+        new = self._normalize_entity(new)
+        existing['attributes'] |= new['attributes']
+        existing['methods'] |= new['methods']
+
+        # Dedup relationships on (source, target, type) so repeated
+        # mentions across files don't blow up the dependency graph
+        seen = {(r['source'], r['target'], r.get('type'))
+                for r in existing['relationships']}
+        for rel in new['relationships']:
+            key = (rel['source'], rel['target'], rel.get('type'))
+            if key not in seen:
+                seen.add(key)
+                existing['relationships'].append(rel)
+
+        existing['rules'].extend(new['rules'])
     
     def _merge_process(self, existing: Dict, new: Dict):
         """Merge two versions of the same business process."""
@@ -180,7 +226,7 @@ class BusinessAnalyzer:
         
         # Perform cross-layer analysis using LLM
         analysis = await self.llm_handler.analyze_chunk(
-            json.dumps(analysis_data),
+            orjson.dumps(analysis_data, default=str).decode(),
             "Cross-layer business logic analysis"
         )
         
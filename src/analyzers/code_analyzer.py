@@ -1,69 +1,174 @@
 import ast
+import asyncio
+import concurrent.futures
+import functools
+import logging
+import os
 from pathlib import Path
-from typing import Dict, List, Any
-import openai
+from typing import Dict, List, Any, Final
 from ..core.config import AnalyzerConfig
+from ..utils.file_io import read_source
+from ..utils.result_cache import ResultCache
+
+logger = logging.getLogger(__name__)
+
+# Prefijo estático e inmutable: los proveedores sólo cachean el prompt si el
+# prefijo es idéntico byte a byte entre llamadas, así que el contenido
+# variable del archivo va siempre después del delimitador.
+_SYSTEM_PROMPT: Final[str] = (
+    "Eres un experto analista de código Python que proporciona "
+    "análisis detallados y objetivos."
+)
+_USER_PREFIX: Final[str] = """Analiza el siguiente código Python y proporciona:
+1. Un resumen de su funcionalidad
+2. Posibles problemas o mejoras
+3. Complejidad ciclomática estimada
+4. Calidad del código (1-10)
+
+Código:"""
+
+# Incrementar al cambiar el prompt: invalida los resultados cacheados
+_PROMPT_VERSION: Final[str] = "1"
+
+# Nodos AST que abren un punto de decisión (complejidad ciclomática)
+_DECISION_NODES = (ast.If, ast.For, ast.AsyncFor, ast.While, ast.Try,
+                   ast.ExceptHandler, ast.BoolOp, ast.Assert,
+                   ast.comprehension, ast.IfExp)
+
+def _calculate_complexity(tree: ast.AST) -> int:
+    """Complejidad ciclomática: 1 + número de puntos de decisión."""
+    return 1 + sum(isinstance(node, _DECISION_NODES)
+                   for node in ast.walk(tree))
+
+def _parse_worker(content: str) -> tuple:
+    """Valida la sintaxis y mide la complejidad en un proceso aparte.
+
+    Debe ser una función de módulo para que sea picklable.
+    """
+    try:
+        tree = ast.parse(content)
+    except SyntaxError:
+        return False, 0
+    return True, _calculate_complexity(tree)
 
 class CodeAnalyzer:
     def __init__(self, config: AnalyzerConfig):
+        # Import diferido: openai arrastra httpx/pydantic y penaliza el
+        # arranque del CLI cuando el análisis ni siquiera se ejecuta.
+        import openai
+
         self.config = config
-        openai.api_key = config.openai_api_key
-        self.client = openai.Client()
-        
+        # Cliente asíncrono: chat.completions.create debe ser awaitable
+        # dentro de analyze_file
+        self.client = openai.AsyncOpenAI(api_key=config.openai_api_key or None)
+        # Fallos esperables por archivo (E/S, API); el resto son bugs
+        self._recoverable_errors = (OSError, openai.APIError)
+        self._file_sem = asyncio.Semaphore(config.max_concurrent_files)
+        self._llm_sem = asyncio.Semaphore(config.max_concurrent_llm)
+        self._result_cache = ResultCache(config.cache_dir / "results")
+        self._parse_pool = None
+
+    def _get_parse_pool(self) -> concurrent.futures.ProcessPoolExecutor:
+        """Pool de procesos perezoso para el análisis estático."""
+        if self._parse_pool is None:
+            self._parse_pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=os.cpu_count())
+        return self._parse_pool
+
+    def _should_analyze(self, file_path: Path) -> bool:
+        """Decide si el archivo es analizable (scan_files ya aplicó ignore_patterns)."""
+        return (file_path.suffix.lower() in self.config._ext_set
+                or file_path.name in self.config._literal_name_set)
+
+    @functools.lru_cache(maxsize=None)
+    def _determine_component_type(self, file_path: Path) -> str:
+        """Clasifica el archivo según su ubicación dentro del proyecto."""
+        parts = {p.lower() for p in file_path.parts}
+        for kind in ('components', 'hooks', 'services', 'controllers',
+                     'models', 'views', 'utils'):
+            if kind in parts:
+                return kind.rstrip('s')
+        return 'module'
+
     async def analyze_file(self, file_path: Path) -> Dict[str, Any]:
         """Analiza un archivo individual usando OpenAI."""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            
-        # Análisis estático básico
         try:
-            ast.parse(content)
-            syntax_valid = True
-        except SyntaxError:
-            syntax_valid = False
+            async with self._file_sem:
+                content = await read_source(file_path, self.config.max_file_bytes)
+        except (OSError, UnicodeDecodeError) as e:
+            # Errores por archivo no deben abortar el análisis del proyecto
+            logger.warning("No se pudo leer %s: %s", file_path, e)
+            return {}
+        if content is None:
+            return {}
+
+        # Contenido sin cambios => resultado cacheado, sin llamada al LLM
+        cache_key = ResultCache.content_key(
+            content, self.config.llm_config.model, _PROMPT_VERSION)
+        if (cached := self._result_cache.get(cache_key)) is not None:
+            return {**cached, "file_path": str(file_path)}
+
+        # Análisis estático básico (sólo aplica a Python). ast.parse retiene
+        # el GIL, así que se despacha al pool de procesos para no frenar
+        # las corrutinas de red.
+        syntax_valid = True
+        complexity = 0
+        if file_path.suffix == ".py":
+            syntax_valid, complexity = await asyncio.get_running_loop().run_in_executor(
+                self._get_parse_pool(), _parse_worker, content)
             
         # Análisis con OpenAI
-        prompt = f"""Analiza el siguiente código Python y proporciona:
-        1. Un resumen de su funcionalidad
-        2. Posibles problemas o mejoras
-        3. Complejidad ciclomática estimada
-        4. Calidad del código (1-10)
-        
-        Código:
-        {content}
-        """
-        
-        response = await self.client.chat.completions.create(
-            model=self.config.model,
-            messages=[
-                {"role": "system", "content": "Eres un experto analista de código Python que proporciona análisis detallados y objetivos."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=self.config.temperature,
-            max_tokens=self.config.max_tokens
-        )
+        async with self._llm_sem:
+            response = await self.client.chat.completions.create(
+                model=self.config.llm_config.model,
+                messages=[
+                    {"role": "system", "content": _SYSTEM_PROMPT},
+                    {"role": "user", "content": _USER_PREFIX + "\n---\n" + content}
+                ],
+                temperature=self.config.llm_config.temperature,
+                max_tokens=self.config.llm_config.max_tokens
+            )
         
         analysis = response.choices[0].message.content
         
-        return {
+        result = {
             "file_path": str(file_path),
+            "component_type": self._determine_component_type(file_path),
             "syntax_valid": syntax_valid,
+            "complexity": complexity,
             "ai_analysis": analysis,
             "loc": len(content.splitlines())
         }
+        self._result_cache.set(cache_key, result)
+        return result
     
     async def analyze_project(self) -> Dict[str, List[Dict[str, Any]]]:
         """Analiza todo el proyecto React."""
+        # Reutilizar el recorrido único del proyecto
+        source_files = [f for f in self.config.scan_files if self._should_analyze(f)]
+
+        # Analizar todos los archivos en paralelo (acotado por los semáforos)
+        try:
+            outcomes = await asyncio.gather(
+                *(self.analyze_file(p) for p in source_files),
+                return_exceptions=True
+            )
+        finally:
+            if self._parse_pool is not None:
+                self._parse_pool.shutdown()
+                self._parse_pool = None
+        # Los errores esperables se registran con su archivo y se omiten
+        # del resultado; cualquier otra excepción se propaga: silenciarlas
+        # produciría un informe vacío sin pista alguna del problema
         results = []
-        
-        # Buscar archivos Python recursivamente
-        python_files = list(self.config.project_root.rglob("*.py"))
-        
-        # Analizar cada archivo
-        for file_path in python_files:
-            result = await self.analyze_file(file_path)
-            results.append(result)
-            
+        for file_path, outcome in zip(source_files, outcomes):
+            if isinstance(outcome, BaseException):
+                if not isinstance(outcome, self._recoverable_errors):
+                    raise outcome
+                logger.warning("Análisis fallido para %s: %s", file_path, outcome)
+            else:
+                results.append(outcome)
+
         return {
             "project_root": str(self.config.project_root),
             "files_analyzed": len(results),
@@ -1,13 +1,19 @@
 # src/analyzers/dependency_analyzer.py
+from __future__ import annotations
+
 from pathlib import Path
-from typing import Dict, Set, List
-import networkx as nx
+from typing import Dict, Optional, Set, List
 import asyncio
+import orjson
 from ..models.entities import CodeComponent, BusinessEntity, DockerService
 from ..utils.llm_handler import LLMHandler
 
 class DependencyAnalyzer:
     def __init__(self, config: 'AnalyzerConfig'):
+        # Deferred import: networkx pulls in scipy-sized dependencies that
+        # shouldn't be paid at module import time.
+        import networkx as nx
+
         self.config = config
         self.llm_handler = LLMHandler(config.llm_config, config.cache_dir)
         self.dependency_graph = nx.DiGraph()
@@ -34,18 +40,19 @@ class DependencyAnalyzer:
     async def _analyze_code_dependencies(self, 
                                        components: Dict[str, CodeComponent]):
         """Analyze dependencies between code components."""
-        # Build initial dependency graph
-        for path, component in components.items():
-            self.dependency_graph.add_node(
-                path,
-                type='code',
-                component_type=component.type,
-                language=component.language
-            )
-            
-            for dep in component.dependencies:
-                self.dependency_graph.add_edge(path, dep)
-        
+        # Build initial dependency graph with the bulk APIs
+        self.dependency_graph.add_nodes_from(
+            (path, {'type': 'code',
+                    'component_type': component.type,
+                    'language': component.language})
+            for path, component in components.items()
+        )
+        self.dependency_graph.add_edges_from(
+            (path, dep)
+            for path, component in components.items()
+            for dep in component.dependencies
+        )
+
         # Enhance with LLM analysis
         analysis_data = {
             'components': {
@@ -60,7 +67,7 @@ class DependencyAnalyzer:
         }
         
         analysis = await self.llm_handler.analyze_chunk(
-            json.dumps(analysis_data),
+            orjson.dumps(analysis_data, default=str).decode(),
             "Code dependency analysis"
         )
         
@@ -77,22 +84,19 @@ class DependencyAnalyzer:
     async def _analyze_business_dependencies(self, 
                                           entities: Dict[str, BusinessEntity]):
         """Analyze dependencies between business entities."""
-        # Add entities to graph
-        for name, entity in entities.items():
-            self.dependency_graph.add_node(
-                f"entity:{name}",
-                type='business',
-                attributes=list(entity.attributes),
-                methods=list(entity.methods)
-            )
-            
-            # Add explicit dependencies
-            for dep in entity.dependencies:
-                self.dependency_graph.add_edge(
-                    f"entity:{name}",
-                    f"entity:{dep}"
-                )
-        
+        # Add entities and their explicit dependencies in bulk
+        self.dependency_graph.add_nodes_from(
+            (f"entity:{name}", {'type': 'business',
+                                'attributes': list(entity.attributes),
+                                'methods': list(entity.methods)})
+            for name, entity in entities.items()
+        )
+        self.dependency_graph.add_edges_from(
+            (f"entity:{name}", f"entity:{dep}")
+            for name, entity in entities.items()
+            for dep in entity.dependencies
+        )
+
         # Enhance with LLM analysis
         analysis_data = {
             'entities': {
@@ -107,7 +111,7 @@ class DependencyAnalyzer:
         }
         
         analysis = await self.llm_handler.analyze_chunk(
-            json.dumps(analysis_data),
+            orjson.dumps(analysis_data, default=str).decode(),
             "Business entity dependency analysis"
         )
         
@@ -123,22 +127,19 @@ class DependencyAnalyzer:
     async def _analyze_infrastructure_dependencies(self, 
                                                 services: Dict[str, DockerService]):
         """Analyze dependencies between infrastructure components."""
-        # Add services to graph
-        for name, service in services.items():
-            self.dependency_graph.add_node(
-                f"service:{name}",
-                type='infrastructure',
-                image=service.image,
-                ports=service.ports
-            )
-            
-            # Add explicit dependencies
-            for dep in service.dependencies:
-                self.dependency_graph.add_edge(
-                    f"service:{name}",
-                    f"service:{dep}"
-                )
-        
+        # Add services and their explicit dependencies in bulk
+        self.dependency_graph.add_nodes_from(
+            (f"service:{name}", {'type': 'infrastructure',
+                                 'image': service.image,
+                                 'ports': service.ports})
+            for name, service in services.items()
+        )
+        self.dependency_graph.add_edges_from(
+            (f"service:{name}", f"service:{dep}")
+            for name, service in services.items()
+            for dep in service.dependencies
+        )
+
         # Enhance with LLM analysis
         analysis_data = {
             'services': {
@@ -154,7 +155,7 @@ class DependencyAnalyzer:
         }
         
         analysis = await self.llm_handler.analyze_chunk(
-            json.dumps(analysis_data),
+            orjson.dumps(analysis_data, default=str).decode(),
             "Infrastructure dependency analysis"
         )
         
@@ -198,7 +199,7 @@ class DependencyAnalyzer:
         }
         
         analysis = await self.llm_handler.analyze_chunk(
-            json.dumps(analysis_data),
+            orjson.dumps(analysis_data, default=str).decode(),
             "Cross-layer dependency analysis"
         )
         
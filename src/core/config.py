@@ -1,15 +1,96 @@
+import os
+import re
 from pathlib import Path
-from typing import Optional
-from dataclasses import dataclass
+from typing import Iterator, List, Optional
+from dataclasses import dataclass, field
 
-@dataclass
-class AnalyzerConfig:
-    project_root: Path
-    openai_api_key: str
+def iter_source_files(root: Path, ignore_re: Optional['re.Pattern'] = None,
+                      exts: Optional[frozenset] = None) -> Iterator[Path]:
+    """Walk root with os.scandir, pruning ignored directories as we go.
+
+    DirEntry reuses the file type reported by getdents64, so this avoids
+    the extra stat() per entry that Path.rglob('*') + is_file() pays, and
+    ignored trees (node_modules etc.) are never descended into at all.
+    """
+    stack = [str(root)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if ignore_re is not None and ignore_re.search(entry.path):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        if exts is None or os.path.splitext(entry.name)[1].lower() in exts:
+                            yield Path(entry.path)
+        except OSError:
+            continue
+
+@dataclass(slots=True)
+class LLMConfig:
+    api_key: str = ""
     model: str = "gpt-4-turbo-preview"
     temperature: float = 0.7
     max_tokens: int = 4096
-    
+    batch_size: int = 3
+    cache_max_entries: int = 1024
+    requests_per_minute: int = 60
+    system_prompt: str = (
+        "You are an expert software analyst. "
+        "Always respond with valid JSON."
+    )
+
+@dataclass(slots=True)
+class AnalyzerConfig:
+    project_root: Path
+    openai_api_key: str
+    llm_config: LLMConfig = field(default_factory=LLMConfig)
+    max_concurrent_files: int = 32
+    max_concurrent_llm: int = 8
+    ignore_patterns: tuple = ('node_modules', '.git', '__pycache__', 'venv', 'dist', 'build')
+    max_file_bytes: int = 512_000
+    cache_dir: Path = Path('.analysis_cache')
+    supported_languages: dict = field(default_factory=lambda: {
+        'python': ('.py',),
+        'javascript': ('.js', '.jsx'),
+        'typescript': ('.ts', '.tsx'),
+    })
+    # Extensionless files worth analyzing despite not mapping to a language
+    literal_file_names: tuple = ('Dockerfile', 'docker-compose.yml')
+    _ignore_re: Optional['re.Pattern'] = field(init=False, repr=False, default=None)
+    _ext_set: frozenset = field(init=False, repr=False, default=frozenset())
+    _literal_name_set: frozenset = field(init=False, repr=False, default=frozenset())
+    _scan_cache: Optional[List[Path]] = field(init=False, repr=False, default=None)
+
     def __post_init__(self):
         if not isinstance(self.project_root, Path):
             self.project_root = Path(self.project_root)
+        if not isinstance(self.cache_dir, Path):
+            self.cache_dir = Path(self.cache_dir)
+        # The nested LLM config inherits the key unless set explicitly
+        if not self.llm_config.api_key:
+            self.llm_config.api_key = self.openai_api_key
+        # All ignore patterns compiled into one alternation: a single scan
+        # of the path instead of one substring search per pattern.
+        self._ignore_re = (
+            re.compile("|".join(map(re.escape, self.ignore_patterns)))
+            if self.ignore_patterns else None
+        )
+        # One flat set: the per-file check is a single C-level hash lookup
+        # instead of a scan over supported_languages.values()
+        self._ext_set = frozenset(
+            ext.lower() for exts in self.supported_languages.values() for ext in exts)
+        self._literal_name_set = frozenset(self.literal_file_names)
+
+    def is_ignored(self, path: Path) -> bool:
+        """Check a path against the ignore patterns in one pass."""
+        return self._ignore_re is not None and bool(self._ignore_re.search(str(path)))
+
+    @property
+    def scan_files(self) -> List[Path]:
+        """Project files, walked once and shared by every analyzer."""
+        # Manual memoization: slots=True rules out functools.cached_property
+        if self._scan_cache is None:
+            self._scan_cache = list(iter_source_files(self.project_root, self._ignore_re))
+        return self._scan_cache
@@ -0,0 +1,83 @@
+# src/models/entities.py
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Set
+
+import numpy as np
+
+@dataclass(slots=True)
+class CodeComponent:
+    path: str
+    type: str = 'module'
+    language: str = 'python'
+    dependencies: Set[str] = field(default_factory=set)
+    metrics: Dict[str, float] = field(default_factory=dict)
+    complexity: float = 0.0
+
+@dataclass(slots=True)
+class CodeComponentTable:
+    """Structure-of-arrays view over a set of CodeComponents.
+
+    Aggregations over numeric columns (mean, max, histogram) run as
+    vectorized numpy ops instead of per-component dict walks.
+    """
+    paths: List[str]
+    complexity: np.ndarray
+    metrics: Dict[str, np.ndarray]
+
+    @classmethod
+    def from_components(cls, components: Dict[str, 'CodeComponent']) -> 'CodeComponentTable':
+        paths = list(components)
+        comps = components.values()
+        complexity = np.fromiter(
+            (c.complexity for c in comps), dtype=np.float64, count=len(paths))
+        # Only metrics present on every component become columns; sparse
+        # ones stay on the individual components
+        metric_keys = set.intersection(*(set(c.metrics) for c in comps)) if paths else set()
+        metrics = {
+            key: np.fromiter((c.metrics[key] for c in comps),
+                             dtype=np.float64, count=len(paths))
+            for key in sorted(metric_keys)
+        }
+        return cls(paths=paths, complexity=complexity, metrics=metrics)
+
+@dataclass(slots=True)
+class BusinessEntity:
+    name: str
+    # Keyed by attribute/method name so merging two versions of the same
+    # entity is a plain dict union instead of a list scan.
+    attributes: Dict[str, Dict] = field(default_factory=dict)
+    methods: Dict[str, Dict] = field(default_factory=dict)
+    dependencies: Set[str] = field(default_factory=set)
+    rules: List[Dict] = field(default_factory=list)
+    source_files: Set[Path] = field(default_factory=set)
+
+@dataclass(slots=True)
+class BusinessProcess:
+    name: str
+    description: str = ''
+    steps: List[str] = field(default_factory=list)
+    entities_involved: Set[str] = field(default_factory=set)
+    entry_points: Set[str] = field(default_factory=set)
+    exit_points: Set[str] = field(default_factory=set)
+    dependencies: Set[str] = field(default_factory=set)
+    critical_paths: List[List[str]] = field(default_factory=list)
+
+@dataclass(slots=True)
+class DockerService:
+    name: str
+    image: str = ''
+    ports: List[str] = field(default_factory=list)
+    volumes: List[str] = field(default_factory=list)
+    environment: Dict[str, str] = field(default_factory=dict)
+    dependencies: Set[str] = field(default_factory=set)
+
+@dataclass(slots=True)
+class AnalysisReport:
+    code_components: Dict[str, CodeComponent]
+    business_entities: Dict[str, BusinessEntity]
+    business_processes: Dict[str, BusinessProcess]
+    docker_services: Dict[str, DockerService]
+    metrics: Dict[str, float] = field(default_factory=dict)
+    risks: List[str] = field(default_factory=list)
+    recommendations: List[str] = field(default_factory=list)
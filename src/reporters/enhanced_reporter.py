@@ -1,38 +1,61 @@
 # src/reporters/enhanced_reporter.py
-from typing import Dict, List
+from collections import Counter
+from operator import attrgetter
+from typing import Callable, Dict, List, Tuple
 from pathlib import Path
-import json
-import asyncio
+import numpy as np
+import orjson
 from ..models.entities import (
-    CodeComponent, BusinessEntity, BusinessProcess, 
+    CodeComponent, CodeComponentTable, BusinessEntity, BusinessProcess,
     DockerService, AnalysisReport
 )
 from ..utils.llm_handler import LLMHandler
 
+# Multi-field extraction in one C-level call per component
+_VIEW_FIELDS = ('complexity', 'metrics')
+_view_getter = attrgetter(*_VIEW_FIELDS)
+
 class EnhancedReporter:
     def __init__(self, config: 'AnalyzerConfig'):
         self.config = config
         self.llm_handler = LLMHandler(config.llm_config, config.cache_dir)
-    
+
+    async def __aenter__(self) -> 'EnhancedReporter':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.llm_handler.aclose()
+
     async def generate_report(self, 
                             code_components: Dict[str, CodeComponent],
                             business_entities: Dict[str, BusinessEntity],
                             business_processes: Dict[str, BusinessProcess],
                             docker_services: Dict[str, DockerService]) -> AnalysisReport:
         """Generate comprehensive analysis report with LLM-enhanced insights."""
-        # Parallel analysis of different aspects
-        analysis_tasks = [
-            self._analyze_code_quality(code_components),
+        # Walk the entity/process/service collections once and share the
+        # totals with every payload builder that needs them
+        aggregates = self._collect_aggregates(
+            business_entities, business_processes, docker_services)
+        # Columnar view of the components: the risks payload aggregates
+        # numeric fields, which numpy does in a handful of vector ops
+        component_table = CodeComponentTable.from_components(code_components)
+        # Canonical per-file view built once; payloads that need per-file
+        # data layer their extra fields on top instead of re-walking the
+        # component objects (kept local so concurrent reports don't share)
+        code_view = {path: dict(zip(_VIEW_FIELDS, _view_getter(comp)))
+                     for path, comp in code_components.items()}
+
+        # Build the four payloads up front and let the handler aggregate the
+        # cache misses into a single rate-limited request
+        analysis_requests = [
+            self._analyze_code_quality(code_components, code_view),
             self._analyze_business_architecture(business_entities, business_processes),
             self._analyze_deployment_architecture(docker_services),
-            self._identify_risks_and_recommendations(
-                code_components, business_entities, 
-                business_processes, docker_services
-            )
+            self._identify_risks_and_recommendations(component_table, aggregates)
         ]
-        
+
         code_quality, business_arch, deployment_arch, risks_and_recs = \
-            await asyncio.gather(*analysis_tasks)
+            await self.llm_handler.analyze_many(analysis_requests)
         
         # Combine all metrics
         metrics = {
@@ -51,109 +74,206 @@ class EnhancedReporter:
             recommendations=risks_and_recs.get('recommendations', [])
         )
     
-    async def _analyze_code_quality(self, 
-                                  code_components: Dict[str, CodeComponent]) -> Dict:
-        """Analyze code quality metrics and patterns."""
-        analysis_data = {
-            'components': {
-                path: {
-                    'type': comp.type,
-                    'language': comp.language,
-                    'complexity': comp.complexity,
-                    'metrics': comp.metrics
+    @staticmethod
+    def _compact(data: Dict) -> Dict:
+        """Dictionary-encode strings repeated three or more times.
+
+        Payload values like language and component-type names repeat per
+        file; interning them into a palette and sending {"$ref": i}
+        references shrinks request bytes and token count. The embedded
+        legend tells the model how to resolve the references.
+        """
+        counts: Counter = Counter()
+
+        def tally(obj):
+            if isinstance(obj, str):
+                if len(obj) > 3:  # shorter strings cost more as refs
+                    counts[obj] += 1
+            elif isinstance(obj, dict):
+                for value in obj.values():
+                    tally(value)
+            elif isinstance(obj, (list, tuple, set)):
+                for value in obj:
+                    tally(value)
+
+        tally(data)
+        palette = [s for s, n in counts.items() if n >= 3]
+        if not palette:
+            return data
+        index = {s: i for i, s in enumerate(palette)}
+
+        def encode(obj):
+            if isinstance(obj, str):
+                ref = index.get(obj)
+                return {"$ref": ref} if ref is not None else obj
+            if isinstance(obj, dict):
+                return {key: encode(value) for key, value in obj.items()}
+            if isinstance(obj, (list, tuple, set)):
+                return [encode(value) for value in obj]
+            return obj
+
+        return {
+            '$palette': palette,
+            '$legend': 'Values of the form {"$ref": i} stand for $palette[i].',
+            'data': encode(data),
+        }
+
+    def _analyze_code_quality(self,
+                                  code_components: Dict[str, CodeComponent],
+                                  code_view: Dict[str, Dict]) -> Tuple[Callable[[], str], str, str]:
+        """Build the code quality analysis request."""
+        def build() -> str:
+            analysis_data = {
+                'components': {
+                    path: {
+                        **code_view[path],
+                        'type': comp.type,
+                        'language': comp.language
+                    }
+                    for path, comp in code_components.items()
                 }
-                for path, comp in code_components.items()
             }
-        }
-        
-        return await self.llm_handler.analyze_chunk(
-            json.dumps(analysis_data),
-            "Code quality analysis"
-        )
+            return orjson.dumps(self._compact(analysis_data), default=str).decode()
+
+        # Content-derived key over the raw fields: cheaper than build()
+        # (no view layering, no palette compaction) but still invalidated
+        # by any value change - counting elements instead served stale
+        # analyses when a value changed in place
+        cache_key = "code-quality\x1e" + orjson.dumps(
+            {path: (comp.type, comp.language, comp.complexity, comp.metrics)
+             for path, comp in code_components.items()},
+            option=orjson.OPT_SORT_KEYS, default=str).decode()
+        return build, "Code quality analysis", cache_key
     
-    async def _analyze_business_architecture(self,
+    def _analyze_business_architecture(self,
                                           entities: Dict[str, BusinessEntity],
-                                          processes: Dict[str, BusinessProcess]) -> Dict:
-        """Analyze business architecture patterns and metrics."""
-        analysis_data = {
-            'entities': {
-                name: {
-                    'attributes': list(entity.attributes),
-                    'methods': list(entity.methods),
-                    'dependencies': list(entity.dependencies),
-                    'rules': entity.rules
-                }
-                for name, entity in entities.items()
-            },
-            'processes': {
-                name: {
-                    'description': process.description,
-                    'steps': process.steps,
-                    'entities_involved': list(process.entities_involved),
-                    'critical_paths': process.critical_paths
+                                          processes: Dict[str, BusinessProcess]) -> Tuple[Callable[[], str], str, str]:
+        """Build the business architecture analysis request."""
+        def build() -> str:
+            analysis_data = {
+                'entities': {
+                    name: {
+                        'attributes': list(entity.attributes),
+                        'methods': list(entity.methods),
+                        'dependencies': list(entity.dependencies),
+                        'rules': entity.rules
+                    }
+                    for name, entity in entities.items()
+                },
+                'processes': {
+                    name: {
+                        'description': process.description,
+                        'steps': process.steps,
+                        'entities_involved': list(process.entities_involved),
+                        'critical_paths': process.critical_paths
+                    }
+                    for name, process in processes.items()
                 }
-                for name, process in processes.items()
             }
-        }
-        
-        return await self.llm_handler.analyze_chunk(
-            json.dumps(analysis_data),
-            "Business architecture analysis"
-        )
+            return orjson.dumps(self._compact(analysis_data), default=str).decode()
+
+        cache_key = "business-arch\x1e" + orjson.dumps(
+            {
+                'entities': {
+                    name: (e.attributes, e.methods, sorted(e.dependencies), e.rules)
+                    for name, e in entities.items()
+                },
+                'processes': {
+                    name: (p.description, p.steps,
+                           sorted(p.entities_involved), p.critical_paths)
+                    for name, p in processes.items()
+                }
+            },
+            option=orjson.OPT_SORT_KEYS, default=str).decode()
+        return build, "Business architecture analysis", cache_key
     
-    async def _analyze_deployment_architecture(self,
-                                            docker_services: Dict[str, DockerService]) -> Dict:
-        """Analyze deployment architecture and container relationships."""
-        analysis_data = {
-            'services': {
-                name: {
-                    'image': service.image,
-                    'dependencies': list(service.dependencies),
-                    'volumes': service.volumes,
-                    'environment': service.environment,
-                    'ports': service.ports
+    def _analyze_deployment_architecture(self,
+                                            docker_services: Dict[str, DockerService]) -> Tuple[Callable[[], str], str, str]:
+        """Build the deployment architecture analysis request."""
+        def build() -> str:
+            analysis_data = {
+                'services': {
+                    name: {
+                        'image': service.image,
+                        'dependencies': list(service.dependencies),
+                        'volumes': service.volumes,
+                        'environment': service.environment,
+                        'ports': service.ports
+                    }
+                    for name, service in docker_services.items()
                 }
-                for name, service in docker_services.items()
             }
-        }
-        
-        return await self.llm_handler.analyze_chunk(
-            json.dumps(analysis_data),
-            "Deployment architecture analysis"
-        )
+            return orjson.dumps(self._compact(analysis_data), default=str).decode()
+
+        cache_key = "deployment\x1e" + orjson.dumps(
+            {name: (svc.image, sorted(svc.dependencies), svc.volumes,
+                    svc.environment, svc.ports)
+             for name, svc in docker_services.items()},
+            option=orjson.OPT_SORT_KEYS, default=str).decode()
+        return build, "Deployment architecture analysis", cache_key
     
-    async def _identify_risks_and_recommendations(self,
-                                                code_components: Dict[str, CodeComponent],
-                                                business_entities: Dict[str, BusinessEntity],
-                                                business_processes: Dict[str, BusinessProcess],
-                                                docker_services: Dict[str, DockerService]) -> Dict:
-        """Identify risks and generate recommendations across all aspects."""
-        analysis_data = {
-            'code_metrics': {
-                path: {
-                    'complexity': comp.complexity,
-                    'metrics': comp.metrics
+    @staticmethod
+    def _collect_aggregates(entities: Dict[str, BusinessEntity],
+                            processes: Dict[str, BusinessProcess],
+                            services: Dict[str, DockerService]) -> Dict[str, int]:
+        """Total the entity/process/service collections in a single pass each.
+
+        sum(map(len, ...)) keeps the per-element len() call at C level.
+        """
+        return {
+            'num_entities': len(entities),
+            'num_processes': len(processes),
+            'num_services': len(services),
+            'entity_rel_count': sum(map(len, (e.dependencies for e in entities.values()))),
+            'process_cp_count': sum(map(len, (p.critical_paths for p in processes.values()))),
+            'service_dep_count': sum(map(len, (s.dependencies for s in services.values()))),
+            'port_count': sum(map(len, (s.ports for s in services.values()))),
+        }
+
+    def _identify_risks_and_recommendations(self,
+                                                table: CodeComponentTable,
+                                                aggregates: Dict[str, int]) -> Tuple[Callable[[], str], str, str]:
+        """Build the cross-cutting risk and recommendation request.
+
+        Sends summary statistics over the component table rather than
+        per-file data: the aggregation runs vectorized and the prompt
+        stays small regardless of project size.
+        """
+        def build() -> str:
+            complexity = table.complexity
+            if len(table.paths):
+                code_metrics = {
+                    'num_files': len(table.paths),
+                    'complexity_total': float(complexity.sum()),
+                    'complexity_mean': float(complexity.mean()),
+                    'complexity_max': float(complexity.max()),
+                    'complexity_hist': np.histogram(complexity, bins=10)[0].tolist(),
+                    'high_complexity_files': int(np.count_nonzero(complexity > 10)),
+                    'metric_means': {key: float(col.mean())
+                                     for key, col in table.metrics.items()},
+                }
+            else:
+                code_metrics = {'num_files': 0}
+            analysis_data = {
+                'code_metrics': code_metrics,
+                'business_complexity': {
+                    'num_entities': aggregates['num_entities'],
+                    'num_processes': aggregates['num_processes'],
+                    'entity_relationships': aggregates['entity_rel_count'],
+                    'process_critical_paths': aggregates['process_cp_count']
+                },
+                'deployment_complexity': {
+                    'num_services': aggregates['num_services'],
+                    'service_dependencies': aggregates['service_dep_count'],
+                    'exposed_ports': aggregates['port_count']
                 }
-                for path, comp in code_components.items()
-            },
-            'business_complexity': {
-                'num_entities': len(business_entities),
-                'num_processes': len(business_processes),
-                'entity_relationships': sum(len(e.dependencies) 
-                                         for e in business_entities.values()),
-                'process_critical_paths': sum(len(p.critical_paths) 
-                                           for p in business_processes.values())
-            },
-            'deployment_complexity': {
-                'num_services': len(docker_services),
-                'service_dependencies': sum(len(s.dependencies) 
-                                         for s in docker_services.values()),
-                'exposed_ports': sum(len(s.ports) 
-                                   for s in docker_services.values())
             }
-        }
-        
-        return await self.llm_handler.analyze_chunk(
-            json.dumps(analysis_data),
-            "Risk and recommendation analysis"
-        )
\ No newline at end of file
+            return orjson.dumps(analysis_data, default=str).decode()
+
+        cache_key = ("risks\x1e" + "\x1e".join(table.paths)
+                     + "\x1e" + table.complexity.tobytes().hex()
+                     + "\x1e" + "\x1e".join(
+                         f"{key}:{col.tobytes().hex()}"
+                         for key, col in table.metrics.items())
+                     + "\x1e" + repr(sorted(aggregates.items())))
+        return build, "Risk and recommendation analysis", cache_key
@@ -0,0 +1,25 @@
+# src/utils/chunking.py
+from typing import Iterator
+
+# Rough heuristic for source code: ~4 characters per token
+_CHARS_PER_TOKEN = 4
+
+class CodeChunker:
+    """Split source into chunks that fit within the model's token budget."""
+
+    def __init__(self, max_tokens: int):
+        # Keep half the budget free for instructions and the reply
+        self.max_chars = max(1, (max_tokens // 2) * _CHARS_PER_TOKEN)
+
+    def chunk_code(self, content: str) -> Iterator[str]:
+        """Yield chunks lazily, splitting on line boundaries."""
+        buffer = []
+        size = 0
+        for line in content.splitlines(keepends=True):
+            if size + len(line) > self.max_chars and buffer:
+                yield "".join(buffer)
+                buffer, size = [], 0
+            buffer.append(line)
+            size += len(line)
+        if buffer:
+            yield "".join(buffer)
@@ -0,0 +1,27 @@
+# src/utils/file_io.py
+import mmap
+from pathlib import Path
+from typing import Optional
+import aiofiles
+
+# Above this size, mmap the file instead of going through TextIOWrapper's
+# intermediate buffers.
+MMAP_THRESHOLD = 64 * 1024
+
+async def read_source(file_path: Path, max_bytes: int) -> Optional[str]:
+    """Read a source file, skipping oversized ones and mmap-ing large ones.
+
+    Returns None when the file exceeds max_bytes — huge files are almost
+    always generated bundles and not worth an LLM call.
+    """
+    size = file_path.stat().st_size
+    if size > max_bytes:
+        return None
+
+    if size > MMAP_THRESHOLD:
+        with open(file_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return mm[:].decode('utf-8', 'replace')
+
+    async with aiofiles.open(file_path, 'r', encoding='utf-8') as f:
+        return await f.read()
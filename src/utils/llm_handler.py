@@ -1,63 +1,363 @@
-from typing import List, Dict, Any, Optional
+from collections import OrderedDict, defaultdict
+from typing import Callable, List, Dict, Any, Optional, Tuple, Union
 import asyncio
+import atexit
+import functools
 import hashlib
 import json
+import logging
+import orjson
+import random
+import time
 from pathlib import Path
+import httpx
 import openai
 from ..core.config import LLMConfig
 
+logger = logging.getLogger(__name__)
+
+try:
+    # SIMD-accelerated hash, ~3x faster than sha256 on large prompts
+    from blake3 import blake3 as _hash
+except ImportError:  # optional dependency; sha256 keeps the cache working
+    _hash = hashlib.sha256
+
+class TokenBucket:
+    """Requests-per-minute throttle applied ahead of every LLM call.
+
+    Proactive throttling avoids 429 responses instead of reacting to them,
+    so the concurrent analyses never stall on server-imposed backoff.
+    """
+
+    def __init__(self, rpm: int):
+        self.rate = rpm / 60.0
+        self.capacity = float(rpm)
+        self.tokens = float(rpm)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: float = 1.0):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity,
+                                  self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+class ShardedCache:
+    """Append-only NDJSON shards instead of one JSON file per entry.
+
+    A cold run used to create thousands of tiny files (one open/write/
+    close per LLM call) and every lookup paid a directory stat. Entries
+    are now buffered and appended in batches to 256 shard files keyed by
+    the first two hex digits of the cache key; lookups come from the
+    per-shard in-memory index built on first access.
+    """
+
+    FLUSH_INTERVAL = 5.0
+    FLUSH_BYTES = 1 << 20
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = cache_dir
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._index: Dict[str, Dict] = {}
+        self._loaded: set = set()
+        self._buffers: Dict[str, list] = defaultdict(list)
+        self._buffered_bytes = 0
+        self._flusher: Optional[asyncio.Task] = None
+        # Final synchronous flush so a normal exit never loses entries
+        atexit.register(self._flush_sync)
+
+    def _shard_path(self, shard: str) -> Path:
+        return self.cache_dir / f"shard_{shard}.ndjson"
+
+    def _load_shard(self, shard: str):
+        if shard in self._loaded:
+            return
+        self._loaded.add(shard)
+        path = self._shard_path(shard)
+        if not path.exists():
+            return
+        with path.open() as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # torn write from a crashed run
+                self._index[entry['key']] = entry['value']
+
+    def get(self, key: str) -> Optional[Dict]:
+        self._load_shard(key[:2])
+        return self._index.get(key)
+
+    def put(self, key: str, value: Dict):
+        self._index[key] = value
+        line = json.dumps({'key': key, 'value': value}) + "\n"
+        self._buffers[key[:2]].append(line)
+        self._buffered_bytes += len(line)
+        if self._buffered_bytes >= self.FLUSH_BYTES:
+            self._flush_sync()
+        elif self._flusher is None or self._flusher.done():
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return  # no loop running; the atexit flush will persist
+            self._flusher = loop.create_task(self._delayed_flush())
+
+    async def _delayed_flush(self):
+        await asyncio.sleep(self.FLUSH_INTERVAL)
+        self._flush_sync()
+
+    def _flush_sync(self):
+        if not self._buffered_bytes:
+            return
+        for shard, lines in self._buffers.items():
+            if lines:
+                with self._shard_path(shard).open('a') as f:
+                    f.writelines(lines)
+                lines.clear()
+        self._buffered_bytes = 0
+
 class LLMHandler:
+    # Shared per API key, not per instance: a server instantiating one
+    # handler per request would otherwise multiply the concurrency and
+    # RPM budget by the number of live handlers and trip 429 backoff.
+    _global_semaphores: Dict[str, asyncio.Semaphore] = {}
+    _global_buckets: Dict[str, TokenBucket] = {}
+
     def __init__(self, config: LLMConfig, cache_dir: Path):
         self.config = config
         self.cache_dir = cache_dir
-        self.semaphore = asyncio.Semaphore(config.batch_size)
-        
-    def _get_cache_key(self, prompt: str) -> str:
-        return hashlib.sha256(prompt.encode()).hexdigest()
-    
-    def _get_cached_response(self, cache_key: str) -> Optional[Dict]:
-        cache_file = self.cache_dir / f"{cache_key}.json"
-        if cache_file.exists():
-            return json.loads(cache_file.read_text())
+        self._disk_cache = ShardedCache(cache_dir)
+        self.semaphore = self._global_semaphores.setdefault(
+            config.api_key, asyncio.Semaphore(config.batch_size))
+        self._bucket = self._global_buckets.setdefault(
+            config.api_key, TokenBucket(config.requests_per_minute))
+        # One pooled client for every call: keep-alive connections skip the
+        # per-request TLS handshake the legacy module-level API paid
+        self._client = openai.AsyncOpenAI(
+            api_key=config.api_key or None,
+            http_client=httpx.AsyncClient(limits=httpx.Limits(
+                max_connections=config.batch_size,
+                max_keepalive_connections=config.batch_size)))
+        # In-process LRU in front of the disk cache: repeated prompts skip
+        # the stat/read/json.loads round-trip entirely
+        self._mem_cache: 'OrderedDict[str, Dict]' = OrderedDict()
+        # Static prompt sections, formatted once. _create_prompt then only
+        # joins them with the per-call context and chunk. Kept as str (not
+        # bytes): the SDK expects str message content, and an identical
+        # prefix between calls lets providers reuse their prompt cache.
+        self._prompt_prefix = "Analyze the following code in the context of "
+        self._prompt_middle = """.
+        Extract and provide a JSON response with:
+        1. Entities...
+        2. Processes...
+        ...
+        Code to analyze:
+        """
+        self._prompt_suffix = """
+        Provide the response in the following JSON format:
+        ...
+        """
+
+    async def aclose(self):
+        """Release the pooled HTTP connections."""
+        await self._client.close()
+
+    @staticmethod
+    @functools.lru_cache(maxsize=2048)
+    def _get_cache_key(prompt: str) -> str:
+        return _hash(prompt.encode()).hexdigest()
+
+    def _mem_get(self, cache_key: str) -> Optional[Dict]:
+        if cache_key in self._mem_cache:
+            self._mem_cache.move_to_end(cache_key)
+            return self._mem_cache[cache_key]
         return None
-    
+
+    def _mem_put(self, cache_key: str, value: Dict):
+        self._mem_cache[cache_key] = value
+        self._mem_cache.move_to_end(cache_key)
+        while len(self._mem_cache) > self.config.cache_max_entries:
+            self._mem_cache.popitem(last=False)
+
+    @staticmethod
+    def _normalize_chunk(chunk: str) -> str:
+        """Canonicalize a chunk so formatting/comment-only variants share a cache entry."""
+        lines = []
+        for line in chunk.splitlines():
+            stripped = line.strip()
+            if not stripped or stripped.startswith(('#', '//', '/*', '*')):
+                continue
+            lines.append(stripped)
+        return "\n".join(lines)
+
+    def _get_cached_response(self, cache_key: str) -> Optional[Dict]:
+        return self._disk_cache.get(cache_key)
+
     def _cache_response(self, cache_key: str, response: Dict):
-        cache_file = self.cache_dir / f"{cache_key}.json"
-        cache_file.write_text(json.dumps(response))
+        self._disk_cache.put(cache_key, response)
     
-    async def analyze_chunk(self, chunk: str, context: str = "") -> Dict:
-        prompt = self._create_prompt(chunk, context)
-        cache_key = self._get_cache_key(prompt)
-        cached = self._get_cached_response(cache_key)
-        if cached:
-            return cached
-        
-        async with self.semaphore:
+    async def _complete(self, prompt: str, **kwargs) -> Any:
+        """Issue one chat completion with rate limiting and backoff retries."""
+        last_error = None
+        for attempt in range(3):
+            await self._bucket.acquire()
             try:
-                response = await openai.ChatCompletion.acreate(
+                return await self._client.chat.completions.create(
                     model=self.config.model,
                     messages=[
                         {"role": "system", "content": self.config.system_prompt},
                         {"role": "user", "content": prompt}
                     ],
                     temperature=self.config.temperature,
-                    max_tokens=self.config.max_tokens
+                    max_tokens=self.config.max_tokens,
+                    **kwargs
                 )
-                result = json.loads(response.choices[0].message.content)
-                self._cache_response(cache_key, result)
-                return result
-            except Exception as e:
-                print(f"Error in LLM analysis: {e}")
-                return {}
+            except openai.RateLimitError as e:
+                last_error = e
+                await asyncio.sleep(2 ** attempt + random.random())
+        raise last_error
 
-    def _create_prompt(self, chunk: str, context: str) -> str:
-        return f"""Analyze the following code in the context of {context}.
-        Extract and provide a JSON response with:
-        1. Entities...
-        2. Processes...
-        ...
-        Code to analyze:
-        {chunk}
-        Provide the response in the following JSON format:
-        ...
+    async def analyze_chunk(self, chunk: Union[str, Callable[[], str]],
+                            context: str = "",
+                            cache_key: Optional[str] = None) -> Dict:
+        """Analyze one chunk, building the prompt only on a cache miss.
+
+        chunk may be a zero-arg callable that yields the text lazily;
+        callers then pass cache_key (cheap, content-derived) so a hit
+        never materializes the chunk at all.
+        """
+        if cache_key is None:
+            if callable(chunk):
+                chunk = chunk()
+            cache_key = self._normalize_chunk(chunk)
+        key = self._get_cache_key(f"{context}\x00{cache_key}")
+        cached = self._mem_get(key)
+        if cached is not None:
+            return cached
+        cached = self._get_cached_response(key)
+        if cached:
+            self._mem_put(key, cached)
+            return cached
+
+        if callable(chunk):
+            chunk = chunk()
+        prompt = self._create_prompt(chunk, context)
+        async with self.semaphore:
+            try:
+                response = await self._complete(
+                    prompt, response_format={"type": "json_object"})
+            except openai.APIError:
+                # Retries for rate limits already happened in _complete;
+                # propagate so the caller's gather fails fast instead of
+                # silently folding an empty analysis into the report
+                logger.exception("LLM analysis failed (context: %s)", context)
+                raise
+            result = orjson.loads(response.choices[0].message.content)
+            self._cache_response(key, result)
+            self._mem_put(key, result)
+            return result
+
+    async def analyze_chunks_batch(self, chunks: List[str], context: str = "") -> List[Dict]:
+        """Analyze several chunks in one request, amortizing the HTTP round-trip."""
+        if not chunks:
+            return []
+        if len(chunks) == 1:
+            return [await self.analyze_chunk(chunks[0], context)]
+
+        cache_key = self._get_cache_key(
+            context + "\x00" + "\x00".join(self._normalize_chunk(c) for c in chunks))
+        cached = self._mem_get(cache_key) or self._get_cached_response(cache_key)
+        if cached:
+            self._mem_put(cache_key, cached)
+            return cached['analyses']
+
+        prompt = self._create_batch_prompt(chunks, context)
+        async with self.semaphore:
+            try:
+                response = await self._complete(
+                    prompt, response_format={"type": "json_object"})
+            except openai.APIError:
+                logger.exception("LLM batch analysis failed (context: %s)", context)
+                raise
+            analyses = orjson.loads(response.choices[0].message.content).get('analyses', [])
+            # Pad so callers can zip results back to their chunks.
+            analyses += [{}] * (len(chunks) - len(analyses))
+            self._cache_response(cache_key, {'analyses': analyses})
+            self._mem_put(cache_key, {'analyses': analyses})
+            return analyses
+
+    async def analyze_many(self, requests: List[Tuple]) -> List[Dict]:
+        """Analyze several (chunk, context[, cache_key]) requests in as few
+        calls as possible.
+
+        Cached requests are answered directly; when more than one misses,
+        the misses are aggregated into a single JSON-array request. As in
+        analyze_chunk, chunk may be a lazy callable paired with a cheap
+        cache_key, so fully-cached reports never build their payloads.
         """
+        results: List[Optional[Dict]] = [None] * len(requests)
+        pending = []
+        for i, req in enumerate(requests):
+            chunk, context = req[0], req[1]
+            material = req[2] if len(req) > 2 else None
+            if material is None:
+                if callable(chunk):
+                    chunk = chunk()
+                material = self._normalize_chunk(chunk)
+            key = self._get_cache_key(f"{context}\x00{material}")
+            cached = self._mem_get(key) or self._get_cached_response(key)
+            if cached is not None:
+                self._mem_put(key, cached)
+                results[i] = cached
+            else:
+                pending.append((i, key, chunk, context, material))
+
+        if len(pending) == 1:
+            i, _, chunk, context, material = pending[0]
+            results[i] = await self.analyze_chunk(chunk, context, cache_key=material)
+        elif pending:
+            blocks = "\n".join(
+                f"--- REQUEST {n} (context: {ctx}) ---\n"
+                f"{chunk() if callable(chunk) else chunk}"
+                for n, (_, _, chunk, ctx, _) in enumerate(pending))
+            prompt = f"""Analyze the following {len(pending)} independent requests.
+            Return a JSON object {{"analyses": [...]}} with one analysis object
+            per request, in the same order as the requests.
+            {blocks}
+            """
+            async with self.semaphore:
+                try:
+                    response = await self._complete(
+                        prompt, response_format={"type": "json_object"})
+                except openai.APIError:
+                    logger.exception("Aggregated LLM analysis failed")
+                    raise
+                analyses = orjson.loads(
+                    response.choices[0].message.content).get('analyses', [])
+            analyses += [{}] * (len(pending) - len(analyses))
+            for (i, key, _, _, _), analysis in zip(pending, analyses):
+                if analysis:
+                    self._cache_response(key, analysis)
+                    self._mem_put(key, analysis)
+                results[i] = analysis
+        return results
+
+    def _create_batch_prompt(self, chunks: List[str], context: str) -> str:
+        blocks = "\n".join(f"--- BLOCK {i} ---\n{chunk}"
+                           for i, chunk in enumerate(chunks))
+        return f"""Analyze the following {len(chunks)} code blocks in the context of {context}.
+        Return a JSON object {{"analyses": [...]}} with one analysis object per
+        block, in the same order as the blocks.
+        {blocks}
+        """
+
+    def _create_prompt(self, chunk: str, context: str) -> str:
+        # One join over precomputed sections; no per-call template formatting
+        return "".join((self._prompt_prefix, context,
+                        self._prompt_middle, chunk, self._prompt_suffix))
@@ -0,0 +1,41 @@
+# src/utils/result_cache.py
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+try:
+    # SIMD-accelerated hash, ~3x faster than sha256 on large files
+    from blake3 import blake3 as _hash
+except ImportError:  # optional dependency; sha256 keeps the cache working
+    _hash = hashlib.sha256
+
+class ResultCache:
+    """On-disk cache of per-file analysis results keyed by content hash.
+
+    Re-runs over unchanged sources skip the LLM call entirely; bumping
+    the prompt version invalidates every entry at once.
+    """
+
+    def __init__(self, cache_dir: Path, expire: int = 7 * 24 * 3600):
+        self.cache_dir = cache_dir
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.expire = expire
+
+    @staticmethod
+    def content_key(content: str, model: str, prompt_version: str = "1") -> str:
+        material = f"{model}:{prompt_version}:{content}".encode()
+        return _hash(material).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        cache_file = self.cache_dir / f"{key}.json"
+        try:
+            if time.time() - cache_file.stat().st_mtime > self.expire:
+                return None
+            return json.loads(cache_file.read_text())
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key: str, value: Dict):
+        (self.cache_dir / f"{key}.json").write_text(json.dumps(value))
@@ -1,14 +1,131 @@
+import asyncio
+import hashlib
+import pickle
+import threading
+from collections import defaultdict
 from typing import Dict, List
 import networkx as nx
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # headless rendering; skips interactive backend setup
 import matplotlib.pyplot as plt
 import plotly.graph_objects as go
 from pathlib import Path
 
+try:
+    # SIMD-accelerated hash, ~3x faster than sha256 on large graphs
+    from blake3 import blake3 as _hash
+except ImportError:  # optional dependency; sha256 keeps the cache working
+    _hash = hashlib.sha256
+
+# Static HTML shell shared by every figure: plotly.js comes from the CDN
+# instead of being inlined (~3 MB per file) and the figure goes in as one
+# JSON blob, skipping Plotly's per-call template rendering entirely.
+_HTML_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>__TITLE__</title>
+<script src="https://cdn.plot.ly/plotly-2.27.0.min.js"></script>
+</head>
+<body>
+<div id="figure" style="height:100vh"></div>
+<script id="data" type="application/json">__FIGURE_JSON__</script>
+<script>
+var fig = JSON.parse(document.getElementById("data").textContent);
+Plotly.newPlot("figure", fig.data, fig.layout);
+</script>
+</body>
+</html>
+"""
+
 class ProjectVisualizer:
     def __init__(self, output_dir: Path):
         self.output_dir = output_dir
         self.output_dir.mkdir(parents=True, exist_ok=True)
-    
+        # spring_layout is O(iterations * V^2); both generators work on the
+        # same dependency graph, so positions are computed once per graph
+        # and persisted so repeated runs warm-start from the last layout
+        self._layout_path = self.output_dir / '.layout.pkl'
+        try:
+            with self._layout_path.open('rb') as f:
+                self._layout_cache: Dict[str, Dict] = pickle.load(f)
+        except (OSError, pickle.PickleError, EOFError):
+            self._layout_cache = {}
+        # generate_all renders both outputs from worker threads; the lock
+        # keeps the layout computed once instead of racing twice
+        self._layout_lock = threading.Lock()
+        # One Figure reused across renders instead of a new pyplot figure
+        # (and its global-state bookkeeping) per call
+        self._fig = plt.figure(figsize=(15, 10))
+
+    def _layout(self, graph: nx.DiGraph) -> Dict:
+        """Force-directed node positions, cached per graph topology.
+
+        With scipy installed networkx switches to its sparse-matrix
+        implementation of Fruchterman-Reingold automatically.
+        """
+        key = self._graph_key(graph)
+        with self._layout_lock:
+            pos = self._layout_cache.get(key)
+            if pos is None:
+                # Warm start from the most recent layout: with small graph
+                # deltas a handful of iterations converges, instead of 50
+                # from random initial positions
+                previous = next(reversed(self._layout_cache.values()), None)
+                seed_pos = ({n: previous[n] for n in graph.nodes if n in previous}
+                            if previous else None) or None
+                pos = nx.spring_layout(graph, k=1,
+                                       iterations=5 if seed_pos else 50,
+                                       weight=None, seed=42, pos=seed_pos)
+                self._layout_cache[key] = pos
+                while len(self._layout_cache) > 8:  # bound the pickle size
+                    self._layout_cache.pop(next(iter(self._layout_cache)))
+                self._save_layouts()
+        return pos
+
+    @staticmethod
+    def _graph_key(graph: nx.DiGraph) -> str:
+        """Stable digest of the graph topology.
+
+        Built-in hash() is salted per process, so it can never match the
+        pickled entries of a previous run; a digest over the sorted node
+        and edge lists survives restarts.
+        """
+        material = repr((sorted(map(str, graph.nodes)),
+                         sorted((str(u), str(v)) for u, v in graph.edges)))
+        return _hash(material.encode()).hexdigest()
+
+    def _save_layouts(self):
+        try:
+            with self._layout_path.open('wb') as f:
+                pickle.dump(self._layout_cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError:
+            pass  # a failed save only costs the next run its warm start
+
+    async def generate_all(self, dependency_graph: nx.DiGraph) -> List[Path]:
+        """Render the HTML and PNG outputs concurrently.
+
+        Both are CPU-bound but spend most of their time in C extensions
+        that release the GIL, so running them in threads overlaps the
+        layout/render work; the shared layout is computed once under the
+        cache lock.
+        """
+        return list(await asyncio.gather(
+            asyncio.to_thread(self._generate_interactive_graph, dependency_graph),
+            asyncio.to_thread(self._generate_static_graph, dependency_graph),
+        ))
+
+    @staticmethod
+    def _write_figure_html(fig: go.Figure, output_path: Path) -> Path:
+        """Write a figure into the cached HTML shell via plain string replace."""
+        title = fig.layout.title.text if fig.layout.title else None
+        html = (_HTML_TEMPLATE
+                .replace('__TITLE__', title or 'Figure')
+                .replace('__FIGURE_JSON__', fig.to_json()))
+        output_path.write_text(html)
+        return output_path
+
     def generate_dependency_graph(self, dependency_graph: nx.DiGraph,
                                 output_format: str = 'html') -> Path:
         """Generate visual representation of dependency graph."""
@@ -19,40 +136,47 @@ class ProjectVisualizer:
     
     def _generate_interactive_graph(self, graph: nx.DiGraph) -> Path:
         """Generate interactive HTML visualization using Plotly."""
-        # Prepare node positions using NetworkX layout
-        pos = nx.spring_layout(graph, k=1, iterations=50)
+        # Prepare node positions using the shared cached layout
+        pos = self._layout(graph)
         
-        # Create node traces by type
-        node_traces = {}
+        # Collect node coordinates per type in one pass; appending to a
+        # Scatter's tuple attributes reallocates (and re-validates) the
+        # whole trace on every node, which is quadratic in node count
+        xs: Dict[str, List[float]] = defaultdict(list)
+        ys: Dict[str, List[float]] = defaultdict(list)
+        texts: Dict[str, List[str]] = defaultdict(list)
         for node, data in graph.nodes(data=True):
             node_type = data.get('type', 'unknown')
-            if node_type not in node_traces:
-                node_traces[node_type] = go.Scatter(
-                    x=[], y=[],
-                    mode='markers+text',
-                    name=node_type,
-                    text=[],
-                    hoverinfo='text',
-                    marker=dict(size=20)
-                )
-            
             x, y = pos[node]
-            node_traces[node_type].x += (x,)
-            node_traces[node_type].y += (y,)
-            node_traces[node_type].text += (node,)
-        
-        # Create edge trace
-        edge_x = []
-        edge_y = []
+            xs[node_type].append(x)
+            ys[node_type].append(y)
+            texts[node_type].append(node)
+
+        node_traces = [
+            go.Scatter(
+                x=np.fromiter(xs[t], dtype=np.float32),
+                y=np.fromiter(ys[t], dtype=np.float32),
+                mode='markers+text',
+                name=t,
+                text=texts[t],
+                hoverinfo='text',
+                marker=dict(size=20)
+            )
+            for t in xs
+        ]
+
+        # Create edge trace: pre-sized arrays with NaN separators instead of
+        # growing Python lists element by element
+        n_edges = graph.number_of_edges()
+        edge_x = np.full(3 * n_edges, np.nan, dtype=np.float32)
+        edge_y = np.full(3 * n_edges, np.nan, dtype=np.float32)
         edge_text = []
-        
-        for edge in graph.edges(data=True):
-            x0, y0 = pos[edge[0]]
-            x1, y1 = pos[edge[1]]
-            edge_x.extend([x0, x1, None])
-            edge_y.extend([y0, y1, None])
+
+        for i, edge in enumerate(graph.edges(data=True)):
+            edge_x[3 * i], edge_y[3 * i] = pos[edge[0]]
+            edge_x[3 * i + 1], edge_y[3 * i + 1] = pos[edge[1]]
             edge_text.append(edge[2].get('type', 'unknown'))
-        
+
         edge_trace = go.Scatter(
             x=edge_x, y=edge_y,
             line=dict(width=0.5, color='#888'),
@@ -60,10 +184,10 @@ class ProjectVisualizer:
             text=edge_text,
             mode='lines'
         )
-        
+
         # Create figure
         fig = go.Figure(
-            data=[edge_trace] + list(node_traces.values()),
+            data=[edge_trace] + node_traces,
             layout=go.Layout(
                 title='Project Dependencies',
                 showlegend=True,
@@ -75,43 +199,33 @@ class ProjectVisualizer:
         )
         
         # Save to file
-        output_path = self.output_dir / 'dependency_graph.html'
-        fig.write_html(str(output_path))
-        return output_path
+        return self._write_figure_html(fig, self.output_dir / 'dependency_graph.html')
     
     def _generate_static_graph(self, graph: nx.DiGraph) -> Path:
         """Generate static visualization using Matplotlib."""
-        plt.figure(figsize=(15, 10))
-        
-        # Create layout
-        pos = nx.spring_layout(graph)
-        
-        # Draw nodes by type
+        # Create layout (shared with the interactive graph)
+        pos = self._layout(graph)
+
+        # One draw_networkx call with a per-node color array replaces the
+        # separate per-type node passes plus edge and label passes
         node_colors = {
             'code': 'lightblue',
             'business': 'lightgreen',
             'infrastructure': 'lightcoral'
         }
-        
-        for node_type, color in node_colors.items():
-            nodes = [n for n, d in graph.nodes(data=True)
-                    if d.get('type') == node_type]
-            nx.draw_networkx_nodes(graph, pos,
-                                 nodelist=nodes,
-                                 node_color=color,
-                                 node_size=1000)
-        
-        # Draw edges
-        nx.draw_networkx_edges(graph, pos, edge_color='gray', arrows=True)
-        
-        # Add labels
-        labels = {node: node for node in graph.nodes()}
-        nx.draw_networkx_labels(graph, pos, labels)
-        
+        colors = [node_colors.get(graph.nodes[n].get('type'), 'gray')
+                  for n in graph.nodes]
+        nx.draw_networkx(graph, pos,
+                         node_color=colors,
+                         node_size=1000,
+                         edge_color='gray',
+                         arrows=True,
+                         ax=self._fig.gca())
+
         # Save to file
         output_path = self.output_dir / 'dependency_graph.png'
-        plt.savefig(output_path)
-        plt.close()
+        self._fig.savefig(output_path, dpi=100)
+        self._fig.clear()
         return output_path
     
     def generate_metrics_dashboard(self, metrics: Dict) -> Path:
@@ -144,13 +258,18 @@ class ProjectVisualizer:
         )
         
         # Save to file
-        output_path = self.output_dir / 'metrics_dashboard.html'
-        fig.write_html(str(output_path))
-        return output_path
+        return self._write_figure_html(fig, self.output_dir / 'metrics_dashboard.html')
 
 if __name__ == "__main__":
     import argparse
-    
+    import asyncio
+
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
     parser = argparse.ArgumentParser(description='Analyze software project')
     parser.add_argument('project_path', help='Path to project root directory')
     parser.add_argument('--openai-key', help='OpenAI API key')
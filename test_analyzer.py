@@ -1,5 +1,13 @@
 import os
 import asyncio
+
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    # uvloop sólo existe en Linux/macOS; el loop estándar sirve igual
+    pass
+
 from src.core.config import AnalyzerConfig
 from src.analyzers.code_analyzer import CodeAnalyzer
 from pathlib import Path